@@ -1,6 +1,10 @@
 import os
-from typing import List, Dict, Union, Optional
-from langchain_groq import ChatGroq
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Union, Optional, Tuple
+from groq import Groq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
@@ -8,10 +12,59 @@ from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from loguru import logger
 import json
-import re
+
+try:
+    import orjson
+    # orjson accepts str directly and raises a json.JSONDecodeError subclass on bad input
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 load_dotenv()
 
+# Faster model for structured extraction, high-quality model for creative writing
+EXTRACT_MODEL = "llama-3.1-8b-instant"
+EMAIL_MODEL = "llama-3.3-70b-versatile"
+
+# Upper bound on parallel Groq requests issued by the batch helpers
+BATCH_MAX_CONCURRENCY = 8
+
+# Number of generated emails kept in the in-process LRU cache
+EMAIL_CACHE_SIZE = 64
+
+# Page text beyond this many characters is dropped before prompting; it only adds token cost
+MAX_PAGE_CHARS = 20000
+
+_FALLBACK_ROLE = 'Position Available'
+_FALLBACK_EXPERIENCE = 'Not specified'
+_FALLBACK_SKILLS = ('General skills required',)
+_FALLBACK_DESCRIPTION_CHARS = 500
+
+def _find_json_span(content: str, open_char: str, close_char: str) -> Optional[str]:
+    """
+    Return the substring from the first open_char to the last close_char.
+
+    Matches what a greedy DOTALL regex search would, but with two linear scans
+    and no backtracking over the LLM output.
+    """
+    start = content.find(open_char)
+    if start == -1:
+        return None
+    end = content.rfind(close_char)
+    if end <= start:
+        return None
+    return content[start:end + 1]
+
+def _normalize_job(job: dict) -> Dict[str, Union[str, List[str]]]:
+    """Coerce a parsed job into the expected schema, reading each field once"""
+    skills = job.get('skills')
+    return {
+        'role': str(job.get('role', 'Unknown Role')),
+        'experience': str(job.get('experience', 'Not specified')),
+        'skills': skills if isinstance(skills, list) else [],
+        'description': str(job.get('description', 'No description available'))
+    }
+
 class Job(BaseModel):
     role: str = Field(description="The job title or role")
     experience: str = Field(description="Years of experience or level required")
@@ -20,29 +73,113 @@ class Job(BaseModel):
 
 class Chain:
     def __init__(self):
-        # Faster model for structured extraction
-        self.llm_fast = ChatGroq(
-            temperature=0,
-            groq_api_key=os.getenv("GROQ_API_KEY"),
-            model_name="llama-3.1-8b-instant"
-        )
-        # High-quality model for creative writing
-        self.llm_quality = ChatGroq(
-            temperature=0,
-            groq_api_key=os.getenv("GROQ_API_KEY"),
-            model_name="llama-3.3-70b-versatile"
-        )
+        # Talk to Groq directly; a LangChain Runnable adds callback and tracing overhead
+        # to what is a single chat completion request
+        self._groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self._executor = ThreadPoolExecutor(max_workers=BATCH_MAX_CONCURRENCY)
         self.output_parser = JsonOutputParser(pydantic_object=Job)
 
+        # Prompts are input-independent, so build them once instead of per request
+        self._extract_prompt = self._build_extract_prompt()
+        self._email_prompt = self._build_email_prompt()
+
+        # LRU cache of generated emails keyed by a hash of the prompt inputs; the models run
+        # at temperature 0, so identical inputs (e.g. "regenerate") would produce the same email
+        self._email_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._email_cache_lock = threading.Lock()
+
     def extract_jobs(self, cleaned_text: str) -> List[Dict[str, Union[str, List[str]]]]:
         """
         Extract job postings from scraped page text.
         """
+        return self.extract_jobs_with_status(cleaned_text)[0]
+
+    def extract_jobs_with_status(
+        self,
+        cleaned_text: str
+    ) -> Tuple[List[Dict[str, Union[str, List[str]]]], bool]:
+        """
+        Extract job postings and report whether extraction succeeded.
+
+        On failure the jobs are a single fallback placeholder and the flag is False,
+        so callers can avoid caching or reusing them.
+        """
         if not cleaned_text or not cleaned_text.strip():
             logger.error("Empty or invalid text provided for job extraction.")
             raise ValueError("Empty or invalid text provided for job extraction.")
 
-        prompt_extract = PromptTemplate(
+        try:
+            content = self._complete(
+                EXTRACT_MODEL,
+                self._extract_prompt.format(page_data=cleaned_text[:MAX_PAGE_CHARS])
+            )
+        except Exception as e:
+            logger.error(f"Error in job extraction: {e}")
+            return [self._create_fallback_job(cleaned_text)], False
+
+        jobs = self._parse_jobs_response(content)
+        if jobs is None:
+            return [self._create_fallback_job(cleaned_text)], False
+        return jobs, True
+
+    def extract_jobs_batch(self, texts: List[str]) -> List[List[Dict[str, Union[str, List[str]]]]]:
+        """
+        Extract job postings from several scraped pages with a single batched LLM call.
+
+        Returns one list of jobs per input text, in the same order.
+        """
+        if not texts:
+            return []
+
+        for text in texts:
+            if not text or not text.strip():
+                logger.error("Empty or invalid text provided for job extraction.")
+                raise ValueError("Empty or invalid text provided for job extraction.")
+
+        try:
+            results = self._complete_batch(
+                EXTRACT_MODEL,
+                [self._extract_prompt.format(page_data=text[:MAX_PAGE_CHARS]) for text in texts]
+            )
+        except Exception as e:
+            logger.error(f"Error in batch job extraction: {e}")
+            return [[self._create_fallback_job(text)] for text in texts]
+
+        jobs_per_text = []
+        for text, res in zip(texts, results):
+            if isinstance(res, Exception):
+                logger.error(f"Error in job extraction: {res}")
+                jobs_per_text.append([self._create_fallback_job(text)])
+            else:
+                jobs = self._parse_jobs_response(res)
+                jobs_per_text.append(jobs if jobs is not None else [self._create_fallback_job(text)])
+
+        return jobs_per_text
+
+    def _complete(self, model: str, prompt: str) -> str:
+        """Send a rendered prompt to Groq and return the completion text"""
+        response = self._groq.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            stream=False
+        )
+        return response.choices[0].message.content or ""
+
+    def _complete_batch(self, model: str, prompts: List[str]) -> List[Union[str, Exception]]:
+        """Run several completions concurrently; failed prompts yield their exception"""
+        futures = [self._executor.submit(self._complete, model, prompt) for prompt in prompts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _build_extract_prompt(self) -> PromptTemplate:
+        """Build the job extraction prompt"""
+        return PromptTemplate(
             template="""
             ### SCRAPED TEXT FROM WEBSITE:
             {page_data}
@@ -57,70 +194,50 @@ class Chain:
             input_variables=["page_data"],
             partial_variables={"format_instructions": self.output_parser.get_format_instructions()}
         )
-        
-        chain_extract = prompt_extract | self.llm_fast
-        
+
+    def _parse_jobs_response(self, content: str) -> Optional[List[Dict[str, Union[str, List[str]]]]]:
+        """Parse and normalize the LLM response of a job extraction prompt; None if nothing usable"""
+        # Use the parser to get structured data
         try:
-            res = chain_extract.invoke(input={"page_data": cleaned_text})
-            # LangChain's JsonOutputParser often handles the parsing automatically if piped
-            # but ChatGroq might return a BaseMessage, so we might need to parse manually if not using a sequential chain
-            
-            content = res.content if hasattr(res, 'content') else str(res)
-            
-            # Use the parser to get structured data
+            parsed = self.output_parser.parse(content)
+        except OutputParserException:
+            # Fallback to manual JSON extraction if specialized parser fails
             try:
-                parsed = self.output_parser.parse(content)
-            except Exception:
-                # Fallback to manual JSON extraction if specialized parser fails
-                json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                if json_match:
-                    parsed = json.loads(json_match.group(0))
+                json_str = _find_json_span(content, '[', ']')
+                if json_str:
+                    parsed = _json_loads(json_str)
                 else:
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    if json_match:
-                        parsed = [json.loads(json_match.group(0))]
+                    json_str = _find_json_span(content, '{', '}')
+                    if json_str:
+                        parsed = [_json_loads(json_str)]
                     else:
                         parsed = []
+            except json.JSONDecodeError as e:
+                logger.warning(f"Could not decode JSON from extraction response: {e}")
+                return None
 
-            # Normalize and validate output
-            if isinstance(parsed, list):
-                validated_jobs = []
-                for job in parsed:
-                    if isinstance(job, dict):
-                        validated_job = {
-                            'role': str(job.get('role', 'Unknown Role')),
-                            'experience': str(job.get('experience', 'Not specified')),
-                            'skills': job.get('skills', []) if isinstance(job.get('skills'), list) else [],
-                            'description': str(job.get('description', 'No description available'))
-                        }
-                        validated_jobs.append(validated_job)
-                
-                logger.info(f"Successfully extracted {len(validated_jobs)} jobs")
-                return validated_jobs if validated_jobs else [self._create_fallback_job(cleaned_text)]
-            
-            elif isinstance(parsed, dict):
-                validated_job = {
-                    'role': str(parsed.get('role', 'Unknown Role')),
-                    'experience': str(parsed.get('experience', 'Not specified')),
-                    'skills': parsed.get('skills', []) if isinstance(parsed.get('skills'), list) else [],
-                    'description': str(parsed.get('description', 'No description available'))
-                }
-                logger.info("Successfully extracted 1 job")
-                return [validated_job]
+        # Normalize and validate output
+        if isinstance(parsed, list):
+            validated_jobs = [_normalize_job(job) for job in parsed if isinstance(job, dict)]
             
-            return [self._create_fallback_job(cleaned_text)]
-
-        except Exception as e:
-            logger.error(f"Error in job extraction: {e}")
-            return [self._create_fallback_job(cleaned_text)]
+            logger.info(f"Successfully extracted {len(validated_jobs)} jobs")
+            return validated_jobs if validated_jobs else None
+        
+        elif isinstance(parsed, dict):
+            logger.info("Successfully extracted 1 job")
+            return [_normalize_job(parsed)]
+        
+        return None
 
     def _create_fallback_job(self, text: str) -> Dict[str, Union[str, List[str]]]:
         """Create a fallback job when extraction fails"""
+        if len(text) > _FALLBACK_DESCRIPTION_CHARS:
+            text = text[:_FALLBACK_DESCRIPTION_CHARS - 3] + '...'
         return {
-            'role': 'Position Available',
-            'experience': 'Not specified',
-            'skills': ['General skills required'],
-            'description': text[:500] + '...' if len(text) > 500 else text
+            'role': _FALLBACK_ROLE,
+            'experience': _FALLBACK_EXPERIENCE,
+            'skills': list(_FALLBACK_SKILLS),
+            'description': text
         }
 
     def write_mail(
@@ -133,16 +250,141 @@ class Chain:
         """
         Generate a cold email based on a job and matched projects with few-shot examples.
         """
-        
+        logger.info(f"Generating email for {job.get('role')} in {tone} tone")
+        return self.write_mail_prepared(self.prepare_email_inputs(job, username, tone), links)
+
+    def write_mail_prepared(self, prepared: Dict[str, str], links: List[Dict[str, str]]) -> str:
+        """
+        Generate a cold email from inputs built by prepare_email_inputs and the matched projects.
+        """
+        inputs = {**prepared, "link_list": self._format_links(links)}
+        key = self._email_cache_key(inputs)
+        cached = self._get_cached_email(key)
+        if cached is not None:
+            logger.info("Using cached email")
+            return cached
+
+        try:
+            email = self._complete(EMAIL_MODEL, self._email_prompt.format(**inputs)).strip()
+            self._cache_email(key, email)
+            return email
+            
+        except Exception as e:
+            logger.error(f"Error generating email: {e}")
+            return f"Error generating email: {str(e)}"
+
+    def write_mail_batch(
+        self,
+        jobs: List[Dict[str, Union[str, List[str]]]],
+        links_list: List[List[Dict[str, str]]],
+        username: str = "User",
+        tone: str = "formal"
+    ) -> List[str]:
+        """
+        Generate one cold email per job with a single batched LLM call.
+
+        `links_list` holds the matched projects for each job, in the same order as `jobs`.
+        """
+        prepared = [self.prepare_email_inputs(job, username, tone) for job in jobs]
+        return self.write_mail_batch_prepared(prepared, links_list)
+
+    def write_mail_batch_prepared(
+        self,
+        prepared: List[Dict[str, str]],
+        links_list: List[List[Dict[str, str]]]
+    ) -> List[str]:
+        """
+        Batched counterpart of write_mail_prepared, one email per prepared input.
+        """
+        if not prepared:
+            return []
+
+        inputs = [
+            {**email_inputs, "link_list": self._format_links(links)}
+            for email_inputs, links in zip(prepared, links_list)
+        ]
+        keys = [self._email_cache_key(email_inputs) for email_inputs in inputs]
+        emails = [self._get_cached_email(key) for key in keys]
+        missing = [i for i, email in enumerate(emails) if email is None]
+        if not missing:
+            logger.info(f"Using {len(emails)} cached emails")
+            return emails
+
+        try:
+            logger.info(f"Generating {len(missing)} emails")
+            results = self._complete_batch(
+                EMAIL_MODEL,
+                [self._email_prompt.format(**inputs[i]) for i in missing]
+            )
+        except Exception as e:
+            logger.error(f"Error generating emails: {e}")
+            results = [e] * len(missing)
+
+        for i, res in zip(missing, results):
+            if isinstance(res, Exception):
+                logger.error(f"Error generating email: {res}")
+                emails[i] = f"Error generating email: {str(res)}"
+            else:
+                emails[i] = res.strip()
+                self._cache_email(keys[i], emails[i])
+        return emails
+
+    @staticmethod
+    def _email_cache_key(inputs: Dict[str, str]) -> bytes:
+        """Hash the rendered email prompt variables into a compact cache key"""
+        joined = "\x1f".join(str(inputs[name]) for name in sorted(inputs))
+        return hashlib.blake2b(joined.encode(), digest_size=16).digest()
+
+    def _get_cached_email(self, key: bytes) -> Optional[str]:
+        with self._email_cache_lock:
+            email = self._email_cache.get(key)
+            if email is not None:
+                self._email_cache.move_to_end(key)
+            return email
+
+    def _cache_email(self, key: bytes, email: str):
+        # An empty completion is a failure; caching it would make every retry fail too
+        if not email:
+            return
+        with self._email_cache_lock:
+            self._email_cache[key] = email
+            self._email_cache.move_to_end(key)
+            if len(self._email_cache) > EMAIL_CACHE_SIZE:
+                self._email_cache.popitem(last=False)
+
+    def prepare_email_inputs(
+        self,
+        job: Dict[str, Union[str, List[str]]],
+        username: str = "User",
+        tone: str = "formal"
+    ) -> Dict[str, str]:
+        """
+        Build the email prompt variables that depend only on the job, so they can be
+        prepared while the portfolio is still being queried.
+        """
+        skills = ", ".join(job.get("skills", []))
+        job_description = f"Role: {job.get('role')}\nSkills: {skills}\nDescription: {job.get('description')}"
+
+        return {
+            "job_description": job_description,
+            "username": username,
+            "tone": tone,
+            "skills": skills
+        }
+
+    @staticmethod
+    def _format_links(links: List[Dict[str, str]]) -> str:
+        """Render matched projects for the email prompt"""
         # Handle links safely
         link_str = "No specific projects matched, but I have general experience in AI-based applications."
         if links and isinstance(links, list):
             descriptions = [link['description'] for link in links if isinstance(link, dict) and link.get('description')]
             if descriptions:
                 link_str = "\n".join(descriptions)
+        return link_str
 
-        job_description = f"Role: {job.get('role')}\nSkills: {', '.join(job.get('skills', []))}\nDescription: {job.get('description')}"
-
+    def _build_email_prompt(self) -> PromptTemplate:
+        """Build the cold email prompt with few-shot examples"""
         # Few-shot examples
         examples = """
         Example 1 (Tone: Professional):
@@ -158,7 +400,7 @@ class Chain:
         Cheers, [Name]
         """
 
-        prompt_email = PromptTemplate.from_template(
+        return PromptTemplate.from_template(
             f"""
             ### EXAMPLES FOR REFERENCE:
             {examples}
@@ -178,22 +420,4 @@ class Chain:
             
             Return only the email content.
             """
-        )
-
-        chain_email = prompt_email | self.llm_quality
-        
-        try:
-            logger.info(f"Generating email for {job.get('role')} in {tone} tone")
-            res = chain_email.invoke({
-                "job_description": job_description,
-                "link_list": link_str,
-                "username": username,
-                "tone": tone,
-                "skills": ", ".join(job.get("skills", []))
-            })
-            
-            return res.content.strip()
-            
-        except Exception as e:
-            logger.error(f"Error generating email: {e}")
-            return f"Error generating email: {str(e)}"
\ No newline at end of file
+        )
\ No newline at end of file
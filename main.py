@@ -1,11 +1,14 @@
 from flask import Flask, render_template, request, jsonify
-from langchain_community.document_loaders import WebBaseLoader
+import requests
 from chains import Chain
 from portfolio import Portfolio
 from utils import clean_text
 from loguru import logger
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import os
+import copy
+import threading
 import traceback
 
 app = Flask(__name__)
@@ -16,15 +19,17 @@ logger.add("app.log", rotation="500 MB")
 # Initialize components with error handling
 try:
     chain = Chain()
+    # Portfolio loads itself into the vector store once on construction
     portfolio = Portfolio()
-    # Load portfolio once at startup to avoid overhead during requests
-    portfolio.load_portfolio()
     logger.info("Application components initialized successfully")
 except Exception as e:
     logger.error(f"Error initializing components: {e}")
     chain = None
     portfolio = None
 
+# Shared worker pool for overlapping independent I/O within a request
+executor = ThreadPoolExecutor(max_workers=4)
+
 # Cache for storing last processed data
 cached_data = {
     "last_job": None,
@@ -34,17 +39,81 @@ cached_data = {
     "last_url": None
 }
 
-@lru_cache(maxsize=50)
+# LRU cache of jobs extracted per URL; only successful extractions are stored, so a
+# failed LLM call (e.g. a 429) is retried on the next request instead of sticking
+JOBS_CACHE_SIZE = 128
+jobs_cache = OrderedDict()
+jobs_cache_lock = threading.Lock()
+
+# Career pages are fetched in chunks and cut off at this size; the LLM never sees more anyway
+MAX_DOWNLOAD_BYTES = 256 * 1024
+DOWNLOAD_CHUNK_SIZE = 8192
+FETCH_TIMEOUT = 10
+FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+}
+
 def get_job_data(url):
-    """Cached function to fetch and clean job data from a URL"""
+    """Fetch and clean job data from a URL"""
     logger.info(f"Scraping and cleaning data from: {url}")
-    loader = WebBaseLoader([url])
-    raw_data = loader.load()
-    
-    if not raw_data:
+    chunks = []
+    size = 0
+    with requests.get(url, stream=True, timeout=FETCH_TIMEOUT, headers=FETCH_HEADERS) as response:
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_DOWNLOAD_BYTES:
+                logger.info(f"Page exceeds {MAX_DOWNLOAD_BYTES} bytes, truncating download")
+                break
+        encoding = response.encoding or "utf-8"
+
+    if not chunks:
         return None
     
-    return clean_text(raw_data[0].page_content)
+    content = b"".join(chunks)[:MAX_DOWNLOAD_BYTES]
+    try:
+        raw_html = content.decode(encoding, errors="replace")
+    except LookupError:
+        # Unknown charset in the response headers; fall back like requests' .text does
+        logger.warning(f"Unknown page encoding {encoding!r}, decoding as utf-8")
+        raw_html = content.decode("utf-8", errors="replace")
+    return clean_text(raw_html)
+
+def get_jobs_for_url(url):
+    """Return the jobs extracted from a URL, skipping the fetch and LLM call for repeat URLs"""
+    with jobs_cache_lock:
+        jobs = jobs_cache.get(url)
+        if jobs is not None:
+            jobs_cache.move_to_end(url)
+    if jobs is not None:
+        logger.info("Using cached jobs")
+        # Callers get their own copy so the cached entry cannot be modified
+        return copy.deepcopy(jobs)
+
+    cleaned_data = get_job_data(url)
+    
+    if not cleaned_data or len(cleaned_data.strip()) < 50:
+        raise ValueError("No valid content could be extracted from the provided URL.")
+
+    logger.info("Extracting jobs...")
+    jobs, succeeded = chain.extract_jobs_with_status(cleaned_data)
+    if succeeded:
+        with jobs_cache_lock:
+            jobs_cache[url] = copy.deepcopy(jobs)
+            jobs_cache.move_to_end(url)
+            if len(jobs_cache) > JOBS_CACHE_SIZE:
+                jobs_cache.popitem(last=False)
+    return jobs
+
+def match_links(skills):
+    """Query the portfolio for projects matching a job's skills"""
+    if not (portfolio.is_ready() and skills):
+        return []
+    links = portfolio.query_links(skills)
+    logger.info(f"Matched {len(links)} portfolio items")
+    return links
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -69,28 +138,25 @@ def index():
 
             try:
                 logger.info(f"Processing URL: {url}")
-                cleaned_data = get_job_data(url)
-                
-                if not cleaned_data or len(cleaned_data.strip()) < 50:
-                    raise ValueError("No valid content could be extracted from the provided URL.")
-
-                logger.info("Extracting jobs...")
-                jobs = chain.extract_jobs(cleaned_data)
+                # Fetch/extraction and vector store warm-up are independent; run them concurrently
+                jobs_future = executor.submit(get_jobs_for_url, url)
+                prime_future = executor.submit(portfolio.load_portfolio)
+                jobs = jobs_future.result()
+                prime_future.result()
                 jobs_found = len(jobs) if jobs else 0
                 
                 if not jobs:
                     raise ValueError("No job postings could be extracted.")
 
                 job = jobs[0]
-                skills = job.get("skills", [])
-                
-                links = []
-                if portfolio.is_ready() and skills:
-                    links = portfolio.query_links(skills)
-                    logger.info(f"Matched {len(links)} portfolio items")
+
+                # Run the portfolio query in the background while the email inputs are built
+                links_future = executor.submit(match_links, job.get("skills", []))
+                prepared = chain.prepare_email_inputs(job, username, tone)
+                links = links_future.result()
 
                 logger.info("Generating email...")
-                email = chain.write_mail(job, links, username=username, tone=tone)
+                email = chain.write_mail_prepared(prepared, links)
                 
                 if not email:
                     raise ValueError("Email generation returned empty result.")
@@ -1,11 +1,73 @@
 import pandas as pd
 import chromadb
-import uuid
+import hashlib
 import os
-from typing import List, Dict, Any
+import csv
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from loguru import logger
 
+# Same model ChromaDB uses by default, so stored and query vectors stay compatible
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 64
+
+# Dynamic int8 quantization of the embedding model's Linear layers (CPU only)
+QUANTIZE_EMBEDDINGS = os.environ.get("QUANTIZE_EMBEDDINGS", "True").lower() == "true"
+
+# Shared by every Portfolio in the process so the model weights are loaded only once
+_EMBEDDER = None
+
+def _get_embedder() -> HuggingFaceEmbeddings:
+    """Return the process-wide embedding model, loading it on first use"""
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        _EMBEDDER = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
+            encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE}
+        )
+        logger.info("Embedding model initialized")
+        if QUANTIZE_EMBEDDINGS:
+            _quantize_embedder(_EMBEDDER)
+    return _EMBEDDER
+
+def _quantize_embedder(embedder: HuggingFaceEmbeddings):
+    """Replace the model's Linear layers with int8 dynamic-quantized versions in place"""
+    try:
+        import torch
+
+        model = embedder.client
+        if model.device.type != "cpu":
+            logger.debug("Skipping embedding quantization on non-CPU device")
+            return
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        logger.info("Embedding model quantized to int8")
+    except Exception as e:
+        logger.warning(f"Could not quantize embedding model, keeping FP32: {e}")
+
+def _content_id(techstack: str, description: str) -> str:
+    """Deterministic vector store id for a project, so re-loading the same rows is a no-op"""
+    return hashlib.blake2b(f"{techstack}\x1f{description}".encode(), digest_size=16).hexdigest()
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+def _is_content_id(item_id: str) -> bool:
+    """True for ids made by _content_id, False for the uuid4 keys used before them"""
+    return len(item_id) == 32 and _HEX_DIGITS.issuperset(item_id)
+
+@lru_cache(maxsize=1024)
+def _skill_set(techstack: str) -> frozenset:
+    """Lowercased skill names of a comma-separated tech stack"""
+    return frozenset(part for part in (raw.strip().lower() for raw in techstack.split(",")) if part)
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Set-overlap score between two skill sets"""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
 class Portfolio:
     def __init__(self, file_path: str = None):
         if file_path is None:
@@ -15,11 +77,21 @@ class Portfolio:
         self.data = None
         self.chroma_client = None
         self.collection = None
+        self.embedding_model = None
+        self._loaded = False
+        # Item count of the collection, tracked locally to avoid a count() call per query
+        self._count = 0
+        self._load_lock = threading.Lock()
         
         self._initialize()
+        self.load_portfolio()
 
     def _initialize(self):
         """Initialize the portfolio with structured logging"""
+        # Rows added since the DataFrame was last rebuilt; merged lazily by _flush_pending()
+        self._pending_rows: List[Dict[str, str]] = []
+        self._pending_lock = threading.Lock()
+
         try:
             if not os.path.exists(self.file_path):
                 logger.warning(f"Portfolio file not found at {self.file_path}")
@@ -38,8 +110,13 @@ class Portfolio:
                 self.data["Description"] = self.data["Description"].astype(str)
                 logger.debug(f"Loaded {len(self.data)} items from CSV")
 
-            # ChromaDB handles embeddings internally by default using all-MiniLM-L6-v2
-            # No need to load a separate model unless specific customization is needed.
+            # Embed on our side so whole batches go through one sentence-transformers call;
+            # if the model cannot be loaded, ChromaDB falls back to embedding internally.
+            try:
+                self.embedding_model = _get_embedder()
+            except Exception as e:
+                logger.warning(f"Embedding model unavailable, using ChromaDB default embeddings: {e}")
+                self.embedding_model = None
 
             try:
                 self.chroma_client = chromadb.PersistentClient("vectorstore")
@@ -54,40 +131,131 @@ class Portfolio:
             logger.exception(f"Critical error during portfolio initialization: {e}")
             self.data = pd.DataFrame(columns=["Techstack", "Description"])
 
+    def _flush_pending(self):
+        """Merge buffered rows into the DataFrame with a single concat"""
+        with self._pending_lock:
+            if not self._pending_rows:
+                return
+            rows, self._pending_rows = self._pending_rows, []
+            self.data = pd.concat([self.data, pd.DataFrame(rows)], ignore_index=True)
+
+    def _append_to_csv(self, row: Dict[str, str]):
+        """Append one row to the portfolio CSV without rewriting the file"""
+        write_header = not os.path.exists(self.file_path) or os.path.getsize(self.file_path) == 0
+        needs_newline = False
+        if write_header:
+            columns = list(self.data.columns)
+        else:
+            # Follow the on-disk column order so appended fields line up with the header
+            with open(self.file_path, newline="", encoding="utf-8") as f:
+                columns = next(csv.reader(f))
+            # A hand-edited file may lack a final newline; the row must not join the last line
+            with open(self.file_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) not in (b"\n", b"\r")
+        with open(self.file_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            if write_header:
+                writer.writerow(columns)
+            elif needs_newline:
+                f.write("\n")
+            writer.writerow([row.get(col, "") for col in columns])
+
+    def _embed_documents(self, documents: List[str]) -> Optional[List[List[float]]]:
+        """Embed documents in batches, or return None to let ChromaDB embed them"""
+        if self.embedding_model is None:
+            return None
+        # Tech stacks repeat across projects; embed each distinct string once and fan out
+        unique = list(dict.fromkeys(documents))
+        embedding_by_text = dict(zip(unique, self.embedding_model.embed_documents(unique)))
+        return [embedding_by_text[doc] for doc in documents]
+
     def load_portfolio(self) -> bool:
+        """Load portfolio data into vector store once; later calls return immediately"""
+        if self._loaded:
+            return True
+
+        with self._load_lock:
+            if not self._loaded:
+                self._loaded = self._load_into_store()
+            return self._loaded
+
+    def _load_into_store(self) -> bool:
         """Load portfolio data into vector store with logging"""
         try:
+            self._flush_pending()
+
             if self.collection is None:
                 logger.error("Portfolio components not properly initialized")
                 return False
 
+            # Track the store's size from the start, so an early return or a failure below
+            # never leaves query_links with a stale count
+            existing = self.collection.count()
+            self._count = existing
+
             if self.data.empty:
                 logger.warning("No portfolio data available to load")
                 return False
 
-            if self.collection.count() > 0:
-                logger.info(f"Portfolio already contains {self.collection.count()} items")
+            # Identical rows share an id and collapse to a single entry
+            rows = {}
+            for techstack, description in zip(self.data["Techstack"].tolist(), self.data["Description"].tolist()):
+                rows.setdefault(_content_id(techstack, description), (techstack, description))
+
+            batch_size = 100
+            stored = set(self.collection.get(ids=list(rows), include=[])["ids"]) if existing else set()
+
+            # Entries beyond the CSV's content ids may be uuid-keyed rows from before content
+            # ids existed. The CSV has always been written alongside the store, so re-key them
+            # once: drop the uuid entries and let the rows below be added under content ids.
+            if existing > len(stored):
+                legacy = [item_id for item_id in self.collection.get(include=[])["ids"]
+                          if not _is_content_id(item_id)]
+                for i in range(0, len(legacy), batch_size):
+                    self.collection.delete(ids=legacy[i:i+batch_size])
+                if legacy:
+                    existing -= len(legacy)
+                    logger.info(f"Re-keying {len(legacy)} legacy portfolio items with content ids")
+
+            ids = [content_id for content_id in rows if content_id not in stored]
+            self._count = existing
+            if not ids:
+                logger.info(f"Portfolio already contains {existing} items")
                 return True
 
-            documents = self.data["Techstack"].tolist()
-            metadatas = [{"description": desc} for desc in self.data["Description"]]
-            ids = [str(uuid.uuid4()) for _ in range(len(documents))]
+            documents = [rows[content_id][0] for content_id in ids]
+            metadatas = [{"description": rows[content_id][1]} for content_id in ids]
+
+            embeddings = self._embed_documents(documents)
 
-            batch_size = 100
             for i in range(0, len(documents), batch_size):
-                self.collection.add(
-                    documents=documents[i:i+batch_size],
-                    metadatas=metadatas[i:i+batch_size],
-                    ids=ids[i:i+batch_size]
-                )
+                batch = {
+                    "documents": documents[i:i+batch_size],
+                    "metadatas": metadatas[i:i+batch_size],
+                    "ids": ids[i:i+batch_size]
+                }
+                if embeddings is not None:
+                    batch["embeddings"] = embeddings[i:i+batch_size]
+                self.collection.add(**batch)
+                self._count += len(batch["ids"])
             
             logger.info(f"Successfully loaded {len(documents)} portfolio items into vector store")
             return True
 
         except Exception as e:
             logger.error(f"Error loading portfolio: {e}")
+            self._refresh_count()
             return False
 
+    def _refresh_count(self):
+        """Re-read the collection size after a load that did not finish"""
+        try:
+            if self.collection is not None:
+                self._count = self.collection.count()
+        except Exception as e:
+            logger.warning(f"Could not read portfolio item count: {e}")
+
     def query_links(self, skills: List[str]) -> List[Dict[str, Any]]:
         """Query portfolio for relevant projects with adaptive results"""
         try:
@@ -99,19 +267,46 @@ class Portfolio:
                 logger.error("Collection not initialized")
                 return []
 
-            valid_skills = [skill.strip() for skill in skills if skill and skill.strip()]
+            valid_skills = []
+            for skill in skills:
+                if not skill:
+                    continue
+                skill = skill.strip()
+                if skill:
+                    valid_skills.append(skill)
             if not valid_skills:
                 return []
 
             query_text = " ".join(valid_skills)
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=min(5, max(1, self.collection.count()))
-            )
+            n_results = min(5, max(1, self._count))
+            if self.embedding_model is not None:
+                results = self.collection.query(
+                    query_embeddings=[self.embedding_model.embed_query(query_text)],
+                    n_results=n_results
+                )
+            else:
+                results = self.collection.query(
+                    query_texts=[query_text],
+                    n_results=n_results
+                )
             
             metadatas = results.get('metadatas', [])
             if metadatas and isinstance(metadatas[0], list):
                 metadatas = metadatas[0]
+
+            # Re-rank the semantic matches by exact skill overlap; sorted() is stable,
+            # so ties keep ChromaDB's similarity order
+            documents = results.get('documents') or []
+            if documents and isinstance(documents[0], list):
+                documents = documents[0]
+            if len(documents) == len(metadatas):
+                query_skills = frozenset(skill.lower() for skill in valid_skills)
+                ranked = sorted(
+                    zip(documents, metadatas),
+                    key=lambda pair: _jaccard(query_skills, _skill_set(pair[0] or "")),
+                    reverse=True
+                )
+                metadatas = [meta for _, meta in ranked]
             
             valid_metadatas = [meta for meta in metadatas if isinstance(meta, dict) and meta.get('description')]
             logger.info(f"Found {len(valid_metadatas)} relevant portfolio items for skills: {valid_skills[:3]}...")
@@ -122,10 +317,14 @@ class Portfolio:
             return []
 
     def get_all_projects(self) -> List[Dict[str, str]]:
+        self._flush_pending()
         if self.data is None or self.data.empty:
             return []
-        return [{"techstack": str(row["Techstack"]), "description": str(row["Description"])} 
-                for _, row in self.data.iterrows()]
+        # Column-wise access avoids materializing a Series per row as iterrows() does
+        techstacks = self.data["Techstack"].to_numpy(dtype=object)
+        descriptions = self.data["Description"].to_numpy(dtype=object)
+        return [{"techstack": str(tech), "description": str(desc)}
+                for tech, desc in zip(techstacks, descriptions)]
 
     def add_project(self, techstack: str, description: str) -> bool:
         """Add a new project with synchronization logging"""
@@ -134,18 +333,26 @@ class Portfolio:
                 logger.error("Both techstack and description are required")
                 return False
 
-            new_row = pd.DataFrame({"Techstack": [techstack], "Description": [description]})
-            self.data = pd.concat([self.data, new_row], ignore_index=True)
-            self.data.to_csv(self.file_path, index=False)
+            row = {"Techstack": techstack, "Description": description}
+            self._append_to_csv(row)
+            with self._pending_lock:
+                self._pending_rows.append(row)
             logger.info(f"Project added to CSV: {techstack[:20]}...")
 
             if self.collection is not None:
-                self.collection.add(
-                    documents=[techstack],
-                    metadatas=[{"description": description}],
-                    ids=[str(uuid.uuid4())]
-                )
-                logger.info("Project added to vector store")
+                content_id = _content_id(techstack, description)
+                # Re-adding an identical project leaves the store unchanged; only count new ids
+                if self.collection.get(ids=[content_id], include=[])["ids"]:
+                    logger.info("Project already in vector store")
+                else:
+                    self.collection.add(
+                        documents=[techstack],
+                        embeddings=self._embed_documents([techstack]),
+                        metadatas=[{"description": description}],
+                        ids=[content_id]
+                    )
+                    self._count += 1
+                    logger.info("Project added to vector store")
 
             return True
         except Exception as e:
@@ -153,6 +360,7 @@ class Portfolio:
             return False
 
     def is_ready(self) -> bool:
+        # Read-only: buffered rows count as data without merging them here
         return (self.collection is not None and 
                 self.data is not None and 
-                not self.data.empty)
\ No newline at end of file
+                (not self.data.empty or bool(self._pending_rows)))
\ No newline at end of file
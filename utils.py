@@ -1,25 +1,86 @@
 import re
+import string
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
 from loguru import logger
 
+try:
+    # Optional linear-time (DFA-based) regex engine with a stdlib-compatible API. Its \b, \w
+    # and \s classes are ASCII-only, so it is used only for patterns that avoid them; the
+    # rest stay on the stdlib re module to keep Unicode text handling unchanged.
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
+try:
+    # Optional C-backed HTML parser, much faster than BeautifulSoup's html.parser. The Lexbor
+    # backend is used because the legacy Modest one (selectolax.parser) is deprecated.
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    # Optional Aho-Corasick automaton for matching the fixed skill vocabulary in one pass
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Byte table keeping alphanumerics and common tech symbols; everything else becomes a space.
+# Non-ASCII characters are first encoded as '?', which the table also maps to a space.
+CLEAN_CHARS_KEEP = (string.ascii_letters + string.digits + '.#+-(),:;').encode('ascii')
+CLEAN_CHARS_TABLE = bytes(c if c in CLEAN_CHARS_KEEP else ord(' ') for c in range(256))
+
+# Bound on memoized URL results; the caches retain the URL strings they have seen
+URL_CACHE_SIZE = 4096
+
+# Characters not allowed in filenames, each replaced by an underscore
+INVALID_FILENAME_CHARS = '<>:"/\\|?*'
+FILENAME_TRANSLATION = str.maketrans(INVALID_FILENAME_CHARS, '_' * len(INVALID_FILENAME_CHARS))
+
+# Domain suffixes stripped when deriving a company name from a URL
+COMPOUND_TLDS = ('.co.uk', '.co.in')
+KNOWN_TLDS = frozenset({'com', 'org', 'net', 'edu', 'gov', 'io'})
+
+# Characters allowed in a hostname label, for regex-free URL validation
+HOST_LABEL_CHARS = frozenset(string.ascii_letters + string.digits + '-')
+
 # Pre-compiled patterns for performance
-CLEAN_CHARS_PATTERN = re.compile(r'[^a-zA-Z0-9\s.#+\-(),:;]')
 WHITESPACE_PATTERN = re.compile(r'\s+')
-HTML_TAG_PATTERN = re.compile(r'<[^>]*?>')
-URL_VALIDATION_PATTERN = re.compile(
-    r'^https?://'  # http:// or https://
-    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-    r'localhost|'  # localhost...
-    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-    r'(?::\d+)?'  # optional port
-    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-COMPANY_DOMAIN_PATTERN = re.compile(r'https?://(?:www\.)?([^/]+)')
-DOMAIN_CLEANUP_PATTERN = re.compile(r'\.(com|org|net|edu|gov|io|co\.uk|co\.in)$')
+HTML_TAG_PATTERN = regex_engine.compile(r'<[^>]*>')
+
+# Common tech skills, grouped by area and fused into one alternation so the text is scanned once
+TECH_SKILL_GROUPS = (
+    r'Python|Java|JavaScript|React|Node\.js|Angular|Vue\.js|Django|Flask|Spring|Express',
+    r'MySQL|PostgreSQL|MongoDB|Redis|SQLite|Oracle|SQL Server',
+    r'AWS|Azure|GCP|Docker|Kubernetes|Git|GitHub|GitLab|Jenkins|CI/CD',
+    r'HTML|CSS|SCSS|SASS|Bootstrap|Tailwind|Material-UI|jQuery',
+    r'Machine Learning|AI|Deep Learning|TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy',
+    r'REST|API|GraphQL|Microservices|Agile|Scrum|DevOps|Testing|TDD|BDD'
+)
+# Matched against lowercased text, so the engine compares plain literals instead of
+# case-folding every character
+TECH_SKILLS_PATTERN = re.compile(r'\b(?:' + '|'.join(TECH_SKILL_GROUPS).lower() + r')\b')
+
+# Canonical spelling of every skill, keyed by its lowercase form
+CANONICAL_SKILLS = {
+    skill.lower(): skill
+    for group in TECH_SKILL_GROUPS
+    for skill in group.replace('\\.', '.').split('|')
+}
+
+if ahocorasick is not None:
+    SKILLS_AUTOMATON = ahocorasick.Automaton()
+    for lowered_skill, skill in CANONICAL_SKILLS.items():
+        SKILLS_AUTOMATON.add_word(lowered_skill, (len(lowered_skill), skill))
+    SKILLS_AUTOMATON.make_automaton()
+else:
+    SKILLS_AUTOMATON = None
 
 def clean_text(text: str) -> str:
     """
-    Clean and normalize text from web scraping using BeautifulSoup.
+    Clean and normalize text from web scraping (selectolax when installed, else BeautifulSoup).
     
     Args:
         text: Raw text from webpage
@@ -31,62 +92,145 @@ def clean_text(text: str) -> str:
         return ""
     
     try:
-        # Use BeautifulSoup to parse HTML and handle edge cases
-        soup = BeautifulSoup(text, "html.parser")
-        
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
-            
-        # Get text and handle whitespace
-        cleaned_text = soup.get_text(separator=' ')
+        cleaned_text = _visible_text(text)
         
         # Keep alphanumeric, spaces, and common tech symbols
-        cleaned_text = CLEAN_CHARS_PATTERN.sub(' ', cleaned_text)
+        cleaned_text = cleaned_text.encode('ascii', 'replace').translate(CLEAN_CHARS_TABLE).decode('ascii')
         
-        # Normalize whitespace
-        cleaned_text = WHITESPACE_PATTERN.sub(' ', cleaned_text)
-        
-        return cleaned_text.strip()
+        # Normalize whitespace; split() with no arguments also strips the ends
+        return ' '.join(cleaned_text.split())
     except Exception as e:
         logger.error(f"Error cleaning text: {e}")
-        # Fallback to basic regex cleaning if BS4 fails
-        text = HTML_TAG_PATTERN.sub('', text)
+        # Fallback to basic regex cleaning if HTML parsing fails; a substring check is far
+        # cheaper than a regex pass that finds nothing
+        if '<' in text:
+            text = HTML_TAG_PATTERN.sub('', text)
         text = WHITESPACE_PATTERN.sub(' ', text)
         return text.strip()
 
+def _visible_text(text: str) -> str:
+    """
+    Return the visible text of an HTML document with script and style content removed.
+    """
+    # Plain text has nothing to parse
+    if '<' not in text and '&' not in text:
+        return text
+
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(text)
+        tree.strip_tags(["script", "style"])
+        root = tree.root
+        return root.text(separator=' ') if root is not None else ""
+
+    # Use BeautifulSoup to parse HTML and handle edge cases
+    soup = BeautifulSoup(text, "html.parser")
+    
+    # Remove script and style elements
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+        
+    return soup.get_text(separator=' ')
+
 def extract_skills_from_text(text: str) -> list:
     """
     Extract potential skills/technologies from text.
+
+    Skills are returned once each, in their canonical spelling (e.g. "JavaScript").
     """
     if not text:
         return []
     
-    # Common tech skills patterns
-    tech_patterns = [
-        r'\b(?:Python|Java|JavaScript|React|Node\.js|Angular|Vue\.js|Django|Flask|Spring|Express)\b',
-        r'\b(?:MySQL|PostgreSQL|MongoDB|Redis|SQLite|Oracle|SQL Server)\b',
-        r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Git|GitHub|GitLab|Jenkins|CI/CD)\b',
-        r'\b(?:HTML|CSS|SCSS|SASS|Bootstrap|Tailwind|Material-UI|jQuery)\b',
-        r'\b(?:Machine Learning|AI|Deep Learning|TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy)\b',
-        r'\b(?:REST|API|GraphQL|Microservices|Agile|Scrum|DevOps|Testing|TDD|BDD)\b'
-    ]
-    
-    skills = []
-    for pattern in tech_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        skills.extend(matches)
-    
-    return list(set(skills))
+    lowered = text.lower()
+    if SKILLS_AUTOMATON is not None:
+        last = len(lowered) - 1
+        skills = set()
+        for end, (length, skill) in SKILLS_AUTOMATON.iter(lowered):
+            # Emulate the regex's \b anchors: reject matches inside a longer word
+            start = end - length + 1
+            if start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if end < last and _is_word_char(lowered[end + 1]):
+                continue
+            skills.add(skill)
+        return list(skills)
+
+    # Stream matches straight into the set rather than materializing a findall() list
+    return list({CANONICAL_SKILLS[match.group()] for match in TECH_SKILLS_PATTERN.finditer(lowered)})
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
 
 def validate_url(url: str) -> bool:
     """
     Validate if a URL is properly formatted.
+
+    Accepts http(s) URLs whose host is a domain name, localhost or an IPv4 address,
+    with an optional port and a path or query. Checked with plain string operations,
+    so the cost stays linear in the URL length whatever the input.
     """
     if not url or not isinstance(url, str):
         return False
-    
-    return URL_VALIDATION_PATTERN.match(url) is not None
+
+    return _validate_url(url)
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _validate_url(url: str) -> bool:
+    """Memoized body of validate_url for string input"""
+    if url.split() != [url]:
+        return False
+
+    scheme, sep, rest = url.partition('://')
+    if not sep or scheme.lower() not in ('http', 'https'):
+        return False
+
+    # Authority runs up to the first '/' or '?'
+    end = len(rest)
+    for delimiter in '/?':
+        index = rest.find(delimiter, 0, end)
+        if index != -1:
+            end = index
+    if rest[end:] == '?':
+        return False
+
+    # Only the path may carry non-ASCII text; checking the authority once up front lets the
+    # host and port checks below use isdigit()/isalpha() without per-part isascii() calls
+    authority = rest[:end]
+    if not authority.isascii():
+        return False
+
+    host, colon, port = authority.partition(':')
+    if colon and not port.isdigit():
+        return False
+
+    return _is_valid_host(host)
+
+def _is_valid_host(host: str) -> bool:
+    """
+    Check an ASCII URL host: localhost, a dotted IPv4 address, or a domain with an alphabetic TLD.
+    """
+    if host.lower() == 'localhost':
+        return True
+
+    parts = host.split('.')
+    if len(parts) == 4 and all(1 <= len(part) <= 3 and part.isdigit() for part in parts):
+        return True
+
+    # A single trailing dot (fully qualified name) is allowed
+    if parts[-1] == '' and len(parts) > 1:
+        parts.pop()
+    if len(parts) < 2:
+        return False
+
+    tld = parts[-1]
+    if not (2 <= len(tld) <= 6 and tld.isalpha()):
+        return False
+
+    return all(
+        0 < len(label) <= 63
+        and label[0] != '-' and label[-1] != '-'
+        and HOST_LABEL_CHARS.issuperset(label)
+        for label in parts[:-1]
+    )
 
 def truncate_text(text: str, max_length: int = 1000) -> str:
     """
@@ -95,7 +239,11 @@ def truncate_text(text: str, max_length: int = 1000) -> str:
     if not text or len(text) <= max_length:
         return text
     
-    return text[:max_length-3] + "..."
+    # No room for an ellipsis; a negative slice would otherwise cut from the end
+    if max_length < 3:
+        return text[:max(max_length, 0)]
+    
+    return f"{text[:max_length - 3]}..."
 
 def format_job_description(job: dict) -> str:
     """
@@ -104,23 +252,18 @@ def format_job_description(job: dict) -> str:
     if not job or not isinstance(job, dict):
         return "No job information available"
     
-    parts = []
-    
-    if job.get('role'):
-        parts.append(f"Role: {job['role']}")
+    role = job.get('role')
+    experience = job.get('experience')
+    skills = job.get('skills')
+    description = job.get('description')
     
-    if job.get('experience'):
-        parts.append(f"Experience: {job['experience']}")
-    
-    if job.get('skills') and isinstance(job['skills'], list):
-        skills_str = ', '.join(job['skills'])
-        parts.append(f"Skills: {skills_str}")
-    
-    if job.get('description'):
-        desc = truncate_text(job['description'], 500)
-        parts.append(f"Description: {desc}")
-    
-    return '\n'.join(parts)
+    # Each entry is either a formatted line or a falsy value that filter() drops
+    return '\n'.join(filter(None, (
+        role and f"Role: {role}",
+        experience and f"Experience: {experience}",
+        skills and isinstance(skills, list) and f"Skills: {', '.join(skills)}",
+        description and f"Description: {truncate_text(description, 500)}",
+    )))
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -129,13 +272,7 @@ def sanitize_filename(filename: str) -> str:
     if not filename:
         return "untitled"
     
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    filename = filename.strip('. ')
-    
-    if not filename:
-        filename = "untitled"
-    
-    return filename
+    return filename.translate(FILENAME_TRANSLATION).strip('. ') or "untitled"
 
 def extract_company_name(url: str) -> Optional[str]:
     """
@@ -144,13 +281,30 @@ def extract_company_name(url: str) -> Optional[str]:
     if not url or not isinstance(url, str):
         return None
     
+    return _extract_company_name(url)
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _extract_company_name(url: str) -> Optional[str]:
+    """Memoized body of extract_company_name for string input"""
     try:
-        domain_match = COMPANY_DOMAIN_PATTERN.search(url)
-        if domain_match:
-            domain = domain_match.group(1)
-            domain = DOMAIN_CLEANUP_PATTERN.sub('', domain)
-            return domain.capitalize()
-        return None
+        parts = urlsplit(url)
+        host = parts.hostname
+        if parts.scheme not in ('http', 'https') or not host:
+            return None
+
+        if host.startswith('www.'):
+            host = host[4:]
+
+        for suffix in COMPOUND_TLDS:
+            if host.endswith(suffix):
+                host = host[:-len(suffix)]
+                break
+        else:
+            head, _, tld = host.rpartition('.')
+            if head and tld in KNOWN_TLDS:
+                host = head
+
+        return host.capitalize() if host else None
     except Exception as e:
         logger.warning(f"Failed to extract company name from {url}: {e}")
         return None
\ No newline at end of file